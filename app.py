@@ -5,8 +5,8 @@ import pandas as pd
 from privacy import password_gate, safe_warning, mask_name
 from schema import ColumnMap, available_columns
 from transform import build_client_table
-from rules import classify_farol
-from credit import credit_eligibility, score_priority_credit
+from parallel import DEFAULT_WORKERS, available_cpus, classify_and_score
+from rules import reason_counts, reason_combinations
 from viz import plot_bar, plot_hist, plot_farol_donut
 
 st.set_page_config(
@@ -44,6 +44,14 @@ with st.sidebar:
     )
 
     salario_minimo = st.number_input("Salário mínimo (R$)", min_value=1.0, value=1412.0, step=10.0)
+    workers = st.number_input(
+        "Processos paralelos",
+        min_value=1,
+        max_value=available_cpus(),
+        value=min(DEFAULT_WORKERS, available_cpus()),
+        step=1,
+        help="Usado apenas em arquivos grandes; bases pequenas são processadas em um único processo.",
+    )
 
     st.markdown("### Upload do CSV")
     uploaded = st.file_uploader("Envie o CSV da carteira", type=["csv"], accept_multiple_files=False)
@@ -119,13 +127,17 @@ if missing:
     safe_warning(f"Mapeie pelo menos estes campos para seguir: {', '.join(missing)}")
     st.stop()
 
-colmap = ColumnMap(mapping=st.session_state.colmap)
+@st.cache_resource(show_spinner="Classificando carteira...", max_entries=2)
+def prepare_clients(raw: pd.DataFrame, mapping: dict, salario_minimo: float, workers: int) -> pd.DataFrame:
+    """Build, classify and score the client table once per upload/configuration.
 
-clients = build_client_table(raw, colmap)
-clients = classify_farol(clients, salario_minimo=salario_minimo)
+    Kept in memory only and returned without a copy, so filter changes neither
+    rerun the process pool nor unpickle the table. Treat it as read-only.
+    """
+    clients = build_client_table(raw, ColumnMap(mapping=mapping))
+    return classify_and_score(clients, salario_minimo=salario_minimo, workers=workers)
 
-clients["credit_eligible"] = credit_eligibility(clients)
-clients["credit_priority_score"] = score_priority_credit(clients, salario_minimo=salario_minimo)
+clients = prepare_clients(raw, dict(st.session_state.colmap), salario_minimo, int(workers))
 
 # Global filters
 st.markdown("## Filtros")
@@ -205,16 +217,13 @@ with tabs[2]:
 
     c1, c2 = st.columns([1, 1])
 
-    red_df = flt[flt["farol"] == "Vermelho"].copy()
-    if not red_df.empty:
-        exploded = red_df.explode("farol_motivos")
+    is_red = flt["farol"] == "Vermelho"
+    if is_red.any():
         top_reasons = (
-            exploded["farol_motivos"]
-            .fillna("Sem motivo")
-            .value_counts()
+            reason_counts(flt, rows=is_red)
             .head(12)
-            .reset_index()
-            .rename(columns={"index": "motivo", "farol_motivos": "qtde"})
+            .rename_axis("motivo")
+            .reset_index(name="qtde")
             .sort_values("qtde")
         )
         c1.plotly_chart(plot_bar(top_reasons, x="qtde", y="motivo", title="Principais motivos do Vermelho"), use_container_width=True)
@@ -231,6 +240,11 @@ with tabs[2]:
     )
     c2.plotly_chart(plot_bar(green_by_port, x="clientes_verde", y="portfolio", title="Verde por carteira"), use_container_width=True)
 
+    if is_red.any():
+        st.markdown("### Combinações de motivos do Vermelho por carteira")
+        combos = reason_combinations(flt, by="portfolio", rows=is_red, n=5)
+        st.dataframe(combos, use_container_width=True, height=420)
+
 with tabs[3]:
     st.subheader("Crédito Gerencial")
     base_enc = flt[flt["farol"] == "Verde"].copy()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+import os
+import sys
+import types
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import pandas as pd
+import numpy as np
+
+from rules import classify_farol
+from credit import credit_eligibility, score_priority_credit
+
+SERIAL_THRESHOLD = 200_000
+DEFAULT_WORKERS = 2
+PARTITION_MODES = ("client_id", "portfolio")
+
+def available_cpus() -> int:
+    """CPUs this process may run on (respects affinity, unlike os.cpu_count)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+@contextmanager
+def _bare_main():
+    """Hide the running script from spawned workers.
+
+    Spawn re-runs `__main__.__file__` in each worker; under Streamlit that is
+    app.py, which would run the whole app there. A `__main__` without
+    `__file__` makes workers import only what the pickled task needs.
+    """
+    main = sys.modules.get("__main__")
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        if main is None:
+            del sys.modules["__main__"]
+        else:
+            sys.modules["__main__"] = main
+
+def _score_partition(part: pd.DataFrame, salario_minimo: float) -> pd.DataFrame:
+    out = classify_farol(part, salario_minimo=salario_minimo)
+    out["credit_eligible"] = credit_eligibility(out)
+    out["credit_priority_score"] = score_priority_credit(out, salario_minimo=salario_minimo)
+    return out
+
+def _partition_keys(clients: pd.DataFrame, n_parts: int, by: str) -> np.ndarray:
+    if by == "portfolio":
+        # Keep each carteira whole, spreading carteiras across partitions.
+        codes = pd.factorize(clients["portfolio"].astype(str), sort=True)[0]
+        return codes % n_parts
+    hashed = pd.util.hash_pandas_object(clients["client_id"].astype(str), index=False).to_numpy()
+    return (hashed % np.uint64(n_parts)).astype(np.int64)
+
+def classify_and_score(
+    clients: pd.DataFrame,
+    salario_minimo: float,
+    workers: int | None = None,
+    by: str = "client_id",
+    serial_threshold: int = SERIAL_THRESHOLD,
+) -> pd.DataFrame:
+    """Run farol classification and credit scoring, partitioned across processes.
+
+    Partitions by `client_id` hash or by `portfolio`. Inputs smaller than
+    `serial_threshold` rows (or with a single worker) run in-process.
+    Without `workers`, uses at most DEFAULT_WORKERS processes.
+    The result keeps the row order of `clients`.
+    """
+    if by not in PARTITION_MODES:
+        raise ValueError(f"Partição inválida: {by!r} (use {', '.join(PARTITION_MODES)})")
+
+    n_workers = workers if workers else min(DEFAULT_WORKERS, available_cpus())
+    if n_workers <= 1 or len(clients) < serial_threshold:
+        return _score_partition(clients, salario_minimo)
+
+    keys = _partition_keys(clients, n_workers, by)
+    # Partition by position so duplicate index labels survive the round trip.
+    positions = [np.flatnonzero(keys == k) for k in range(n_workers)]
+    positions = [pos for pos in positions if len(pos)]
+    if len(positions) <= 1:
+        return _score_partition(clients, salario_minimo)
+    parts = [clients.iloc[pos] for pos in positions]
+
+    # Streamlit runs several threads; forking it can deadlock the workers.
+    ctx = multiprocessing.get_context("spawn")
+    with _bare_main(), ProcessPoolExecutor(max_workers=len(parts), mp_context=ctx) as pool:
+        results = list(pool.map(_score_partition, parts, [salario_minimo] * len(parts)))
+
+    order = np.argsort(np.concatenate(positions), kind="stable")
+    return pd.concat(results).iloc[order]
@@ -2,6 +2,47 @@ from __future__ import annotations
 import pandas as pd
 import numpy as np
 
+# Reason texts, in display order. Bit i of `farol_motivos_mask` is REASONS[i].
+REASONS = (
+    "Movimentação > 18m (Perdido)",
+    "Em prejuízo",
+    "Restrição impeditiva",
+    "PF > 75a com renda < 10k e aplicações < 50k",
+    "Movimentação 6-18m (Inativo)",
+    "Sem movimento recente (não ativo)",
+    "Não correntista (ex: poupança)",
+    "Renda desatualizada (> 4 anos)",
+    "Renda <= 1 salário mínimo",
+    "Escore fora de N01-N04",
+    "Estágio final fora 01-02",
+    "Atraso >= 60 dias",
+    "Sem contato válido",
+    "Conta principal fora da agência",
+    "Não encarteirável",
+    "Encarteirável (cumpre premissas)",
+)
+(
+    REASON_LOST,
+    REASON_IN_LOSS,
+    REASON_RESTRICTIVE,
+    REASON_ELDER_BLOCK,
+    REASON_INACTIVE,
+    REASON_NO_MOVEMENT,
+    REASON_NOT_CHECKING,
+    REASON_INCOME_OUTDATED,
+    REASON_LOW_INCOME,
+    REASON_SCORE,
+    REASON_STAGE,
+    REASON_DELAY,
+    REASON_NO_CONTACT,
+    REASON_NOT_MAIN_AGENCY,
+    REASON_NOT_ELIGIBLE,
+    REASON_ELIGIBLE,
+) = (1 << i for i in range(len(REASONS)))
+
+def mask_to_reasons(mask: int) -> list[str]:
+    return [r for i, r in enumerate(REASONS) if mask >> i & 1]
+
 def _score_n_to_int(score_band: str) -> int | None:
     if not isinstance(score_band, str):
         return None
@@ -17,11 +58,11 @@ def classify_farol(clients: pd.DataFrame, salario_minimo: float) -> pd.DataFrame
     """Apply farol rules (Verde / Vermelho / Cinza) with explicit reasons."""
     df = clients.copy()
 
-    reasons = []
+    masks = []
     farol = []
 
     for _, r in df.iterrows():
-        motivo = []
+        motivo = 0
 
         months_mov = r.get("months_since_movement", np.nan)
         has_loss = bool(r.get("is_in_loss", False))
@@ -33,11 +74,11 @@ def classify_farol(clients: pd.DataFrame, salario_minimo: float) -> pd.DataFrame
         # CINZA (Impedido)
         is_lost = pd.notna(months_mov) and months_mov > 18
         if is_lost:
-            motivo.append("Movimentação > 18m (Perdido)")
+            motivo |= REASON_LOST
         if has_loss:
-            motivo.append("Em prejuízo")
+            motivo |= REASON_IN_LOSS
         if has_restr:
-            motivo.append("Restrição impeditiva")
+            motivo |= REASON_RESTRICTIVE
 
         is_elder_block = (
             pd.notna(age) and age > 75
@@ -45,11 +86,11 @@ def classify_farol(clients: pd.DataFrame, salario_minimo: float) -> pd.DataFrame
             and pd.notna(avg_balance) and avg_balance < 50_000
         )
         if is_elder_block:
-            motivo.append("PF > 75a com renda < 10k e aplicações < 50k")
+            motivo |= REASON_ELDER_BLOCK
 
         if motivo:
             farol.append("Cinza")
-            reasons.append(motivo)
+            masks.append(motivo)
             continue
 
         # VERDE (Encarteirável)
@@ -58,57 +99,101 @@ def classify_farol(clients: pd.DataFrame, salario_minimo: float) -> pd.DataFrame
         if not (pd.notna(months_mov) and months_mov <= 6):
             ok = False
             if pd.notna(months_mov) and 6 < months_mov <= 18:
-                motivo.append("Movimentação 6-18m (Inativo)")
+                motivo |= REASON_INACTIVE
             else:
-                motivo.append("Sem movimento recente (não ativo)")
+                motivo |= REASON_NO_MOVEMENT
 
         acct = str(r.get("account_type", "")).lower()
         is_correntista = ("corrente" in acct) and ("poup" not in acct or "corrente" in acct)
         if not is_correntista:
             ok = False
-            motivo.append("Não correntista (ex: poupança)")
+            motivo |= REASON_NOT_CHECKING
 
         months_income = r.get("months_since_income_update", np.nan)
         if not (pd.notna(months_income) and months_income <= 48):
             ok = False
-            motivo.append("Renda desatualizada (> 4 anos)")
+            motivo |= REASON_INCOME_OUTDATED
 
         if not (pd.notna(income) and income > salario_minimo):
             ok = False
-            motivo.append("Renda <= 1 salário mínimo")
+            motivo |= REASON_LOW_INCOME
 
         score_n = _score_n_to_int(str(r.get("score_band", "")))
         if not (score_n is not None and 1 <= score_n <= 4):
             ok = False
-            motivo.append("Escore fora de N01-N04")
+            motivo |= REASON_SCORE
 
         stage = str(r.get("final_stage", "")).strip()
         if stage not in {"01", "1", "02", "2"}:
             ok = False
-            motivo.append("Estágio final fora 01-02")
+            motivo |= REASON_STAGE
 
         max_delay = r.get("max_delay_days", 0)
         if pd.notna(max_delay) and float(max_delay) >= 60:
             ok = False
-            motivo.append("Atraso >= 60 dias")
+            motivo |= REASON_DELAY
 
         if not bool(r.get("has_valid_contact", False)):
             ok = False
-            motivo.append("Sem contato válido")
+            motivo |= REASON_NO_CONTACT
 
         if not bool(r.get("agency_is_main", False)):
             ok = False
-            motivo.append("Conta principal fora da agência")
+            motivo |= REASON_NOT_MAIN_AGENCY
 
         if ok:
             farol.append("Verde")
-            reasons.append(["Encarteirável (cumpre premissas)"])
+            masks.append(REASON_ELIGIBLE)
         else:
             farol.append("Vermelho")
-            reasons.append(motivo if motivo else ["Não encarteirável"])
+            masks.append(motivo if motivo else REASON_NOT_ELIGIBLE)
 
     df["farol"] = farol
-    df["farol_motivos"] = reasons
+    df["farol_motivos"] = [mask_to_reasons(m) for m in masks]
+    df["farol_motivos_mask"] = np.asarray(masks, dtype=np.uint16)
     df["is_encarteiravel"] = df["farol"].eq("Verde")
     df["is_impedido"] = df["farol"].eq("Cinza")
     return df
+
+def _align_rows(df: pd.DataFrame, rows: pd.Series) -> pd.Series:
+    if rows.index.equals(df.index):
+        return rows
+    return rows.reindex(df.index, fill_value=False)
+
+def reason_counts(df: pd.DataFrame, rows: pd.Series | None = None) -> pd.Series:
+    """Clients per reason, summed over the reason bitmask (no explode).
+
+    `rows` is an optional boolean filter aligned with `df`.
+    """
+    bits = df["farol_motivos_mask"].to_numpy(dtype=np.uint16)
+    if rows is not None:
+        bits = bits[_align_rows(df, rows).to_numpy(dtype=bool)]
+    counts = pd.Series(
+        [np.count_nonzero(bits & (1 << i)) for i in range(len(REASONS))],
+        index=list(REASONS),
+    )
+    return counts[counts > 0].sort_values(ascending=False)
+
+def reason_combinations(
+    df: pd.DataFrame,
+    by: str = "portfolio",
+    rows: pd.Series | None = None,
+    n: int = 5,
+) -> pd.DataFrame:
+    """Top `n` reason combinations per group of `by` (e.g. carteira), by client count."""
+    sub = df[[by, "farol_motivos_mask"]]
+    if rows is not None:
+        sub = sub[_align_rows(df, rows).to_numpy(dtype=bool)]
+    combos = (
+        sub.groupby([by, "farol_motivos_mask"], dropna=False)
+        .size()
+        .rename("clientes")
+        .reset_index()
+        .sort_values("clientes", ascending=False, kind="stable")
+        .groupby(by, dropna=False)
+        .head(n)
+        .sort_values(by, kind="stable")
+    )
+    labels = {m: " + ".join(mask_to_reasons(m)) for m in combos["farol_motivos_mask"].unique()}
+    combos["motivos"] = combos["farol_motivos_mask"].map(labels)
+    return combos[[by, "motivos", "clientes"]].reset_index(drop=True)
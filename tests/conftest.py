@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Modules live at the project root (see README), so make them importable.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+@pytest.fixture
+def salario_minimo() -> float:
+    return 1412.0
+
+@pytest.fixture
+def make_clients():
+    """Factory for a synthetic client table (build_client_table output columns)."""
+    def _make(n: int = 600) -> pd.DataFrame:
+        rng = np.random.default_rng(0)
+        return pd.DataFrame({
+            "client_id": [str(i) for i in range(n)],
+            "portfolio": rng.choice(["A", "B", "C", "D"], n),
+            "age": rng.uniform(18, 90, n),
+            "income_value": rng.uniform(500, 20_000, n),
+            "avg_balance": rng.uniform(0, 90_000, n),
+            "employment_link": rng.choice(["clt", "autonomo"], n),
+            "months_since_movement": rng.choice([1.0, 8.0, 20.0, np.nan], n),
+            "months_since_income_update": rng.choice([10.0, 60.0], n),
+            "account_type": rng.choice(["corrente", "poupança"], n),
+            "has_restrictive": rng.random(n) < 0.05,
+            "is_in_loss": rng.random(n) < 0.05,
+            "score_band": rng.choice(["N01", "N03", "N05", "N09"], n),
+            "final_stage": rng.choice(["01", "02", "03"], n),
+            "max_delay_days": rng.choice([0.0, 10.0, 70.0], n),
+            "has_valid_contact": rng.random(n) < 0.9,
+            "agency_is_main": rng.random(n) < 0.9,
+            "potential_pct": rng.uniform(0, 100, n),
+            "products_count": rng.integers(0, 9, n),
+        })
+    return _make
@@ -0,0 +1,40 @@
+import sys
+import types
+
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from parallel import _score_partition, classify_and_score
+
+@pytest.mark.parametrize("by", ["client_id", "portfolio"])
+def test_parallel_matches_serial(by, make_clients, salario_minimo):
+    clients = make_clients()
+    serial = _score_partition(clients, salario_minimo)
+    parallel = classify_and_score(clients, salario_minimo, workers=3, by=by, serial_threshold=1)
+    pdt.assert_frame_equal(serial, parallel)
+
+@pytest.mark.parametrize("by", ["client_id", "portfolio"])
+def test_parallel_keeps_duplicate_index(by, make_clients, salario_minimo):
+    clients = make_clients(200)
+    clients = pd.concat([clients, clients.iloc[::-1]])
+    serial = _score_partition(clients, salario_minimo)
+    parallel = classify_and_score(clients, salario_minimo, workers=2, by=by, serial_threshold=1)
+    pdt.assert_frame_equal(serial, parallel)
+
+def test_invalid_partition_mode(make_clients, salario_minimo):
+    with pytest.raises(ValueError):
+        classify_and_score(make_clients(10), salario_minimo, by="agency")
+
+def test_spawn_workers_do_not_rerun_app_script(tmp_path, monkeypatch, make_clients, salario_minimo):
+    # Streamlit swaps in a __main__ whose __file__ is app.py while a script runs.
+    script = tmp_path / "app.py"
+    script.write_text("raise RuntimeError('app script re-run in worker')\n")
+    fake_main = types.ModuleType("__main__")
+    fake_main.__file__ = str(script)
+    monkeypatch.setitem(sys.modules, "__main__", fake_main)
+
+    clients = make_clients(200)
+    parallel = classify_and_score(clients, salario_minimo, workers=2, serial_threshold=1)
+    pdt.assert_frame_equal(_score_partition(clients, salario_minimo), parallel)
+    assert sys.modules["__main__"] is fake_main
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from rules import REASONS, classify_farol, mask_to_reasons, reason_combinations, reason_counts
+
+@pytest.fixture
+def classified(make_clients, salario_minimo) -> pd.DataFrame:
+    return classify_farol(make_clients(), salario_minimo)
+
+def test_mask_matches_reason_list(classified):
+    df = classified
+    assert [mask_to_reasons(m) for m in df["farol_motivos_mask"]] == df["farol_motivos"].tolist()
+    assert set(df["farol_motivos"].explode()) <= set(REASONS)
+
+def test_reason_counts_matches_explode(classified):
+    df = classified
+    red = df["farol"].eq("Vermelho")
+    expected = df.loc[red, "farol_motivos"].explode().value_counts()
+    counts = reason_counts(df, rows=red)
+    assert counts.to_dict() == expected.to_dict()
+
+def test_reason_counts_aligns_rows_by_label(classified):
+    df = classified
+    red = df["farol"].eq("Vermelho")
+    shuffled = red.sample(frac=1, random_state=1)
+    assert reason_counts(df, rows=shuffled).equals(reason_counts(df, rows=red))
+
+def test_reason_combinations_top_n_per_group(classified):
+    df = classified
+    red = df["farol"].eq("Vermelho")
+    combos = reason_combinations(df, by="portfolio", rows=red, n=2)
+    assert set(combos["portfolio"]) == set(df.loc[red, "portfolio"])
+    assert combos.groupby("portfolio").size().max() <= 2
+    for _, grp in combos.groupby("portfolio"):
+        assert grp["clientes"].is_monotonic_decreasing
+
+    # Shuffled and holding only the selected labels: must align by label.
+    partial = red[red].sample(frac=1, random_state=1)
+    pd.testing.assert_frame_equal(reason_combinations(df, by="portfolio", rows=partial, n=2), combos)
+    assert reason_counts(df, rows=partial).equals(reason_counts(df, rows=red))